@@ -1,7 +1,7 @@
 import os
 import streamlit as st
 
-from main import transcribe_audio, generate_response
+from main import transcribe_audio, generate_response, stream_response
 from prompt_managements import pm
 
 # Constants
@@ -14,27 +14,103 @@ def init_session_state() -> None:
         st.session_state.context = ""
     if "chat" not in st.session_state:
         st.session_state.chat = []
+    if "chat_history_text" not in st.session_state:
+        st.session_state.chat_history_text = ""
+
+def display_chat_message(msg: dict) -> None:
+    """Display a single chat message with audio playback"""
+    with st.container(border=True):
+        role_label = "**Me**" if msg["role"] == "me" else "**Assistant**"
+        st.write(role_label)
+        if role_label == "**Me**":
+            if "audio" in msg:
+                st.audio(msg["audio"], format="audio/wav")
+            else:
+                st.caption("Audio unavailable for this message")
+        with st.expander("Show details", expanded=False):
+            st.write(f"**Message:** {msg['content']}")
 
 def display_chat_history() -> None:
     """Display the chat history with audio playback"""
     for msg in st.session_state.chat:
-        with st.container(border=True):
-            role_label = "**Me**" if msg["role"] == "me" else "**Assistant**"
-            st.write(role_label)
-            if role_label == "**Me**":
-                if "audio" in msg:
-                    st.audio(msg["audio"], format="audio/wav")
-                else:
-                    st.caption("Audio unavailable for this message")
-            with st.expander("Show details", expanded=False):
-                st.write(f"**Message:** {msg['content']}")
+        display_chat_message(msg)
 
 def format_chat_history() -> str:
     """Format the chat history for prompt context"""
-    return "\n".join(
-            f"{msg['role'].capitalize()}: {msg['content']}"
-            for msg in st.session_state.chat
-    )
+    if not st.session_state.chat_history_text and st.session_state.chat:
+        # Rebuild from the message list if the cached text is missing
+        st.session_state.chat_history_text = "\n".join(
+                f"{msg['role'].capitalize()}: {msg['content']}"
+                for msg in st.session_state.chat
+        )
+    return st.session_state.chat_history_text
+
+def add_chat_message(message: dict) -> None:
+    """Append a message to the chat and to the cached history text"""
+    # Rebuild the cached text first in case it is missing for existing messages
+    history = format_chat_history()
+    st.session_state.chat.append(message)
+    line = f"{message['role'].capitalize()}: {message['content']}"
+    st.session_state.chat_history_text = f"{history}\n{line}" if history else line
+
+@st.fragment
+def chat_fragment(groq_api_key: str) -> None:
+    """Chat history and voice input, rerun on its own when its widgets change"""
+    # Display chat history
+    display_chat_history()
+
+    # Placeholder so a new turn is drawn in place, above the input
+    new_turn = st.container()
+
+    # Audio input section
+    audio_col, btn_col = st.columns([3, 1])
+
+    with audio_col:
+        audio_value = st.audio_input("Record a voice message")
+
+    with btn_col:
+        # Add vertical spacing
+        st.write("")
+        st.write("")
+        st.write("")
+        send_clicked = st.button("Send", use_container_width=True)
+
+    if send_clicked:
+        if not audio_value:
+            st.error("Please record a voice message before sending.")
+        elif not groq_api_key:
+            st.error("Please enter your Groq API key before sending.")
+        else:
+            # Process user audio
+            audio_bytes = audio_value.read()
+            text = transcribe_audio(audio_bytes)
+            user_msg = {"role": "me", "content": text, "audio": audio_bytes}
+            add_chat_message(user_msg)
+            with new_turn:
+                display_chat_message(user_msg)
+
+            # Generate AI response
+            chat_history = format_chat_history()
+            prompt_vars = {
+                    "Context": st.session_state.context,
+                    "ChatHistory": chat_history
+            }
+
+            chat_prompt = pm.get_prompt("chat_prompt", variables=prompt_vars)
+
+            # Stream the response as it is generated instead of rerunning the page.
+            # The expander stays open while streaming; the history shows it collapsed.
+            with new_turn, st.container(border=True):
+                st.write("**Assistant**")
+                with st.expander("Show details", expanded=True):
+                    st.write("**Message:**")
+                    ai_response = st.write_stream(stream_response(chat_prompt, MODEL_CHAT, groq_api_key))
+
+            # Add to chat history
+            add_chat_message({
+                    "role": "you",
+                    "content": ai_response,
+            })
 
 def main():
     """Main application function"""
@@ -57,49 +133,8 @@ def main():
         st.write("**Context:**")
         st.info(st.session_state.context)
 
-    # Display chat history
-    display_chat_history()
-
-    # Audio input section
-    audio_col, btn_col = st.columns([3, 1])
-
-    with audio_col:
-        audio_value = st.audio_input("Record a voice message")
-
-    with btn_col:
-        # Add vertical spacing
-        st.write("")
-        st.write("")
-        st.write("")
-        if st.button("Send", use_container_width=True):
-            if not audio_value:
-                st.error("Please record a voice message before sending.")
-            elif not groq_api_key:
-                st.error("Please enter your Groq API key before sending.")
-            else:
-                # Process user audio
-                audio_bytes = audio_value.read()
-                text = transcribe_audio(audio_bytes)
-                st.session_state.chat.append({"role": "me", "content": text, "audio": audio_bytes})
-
-                # Generate AI response
-                chat_history = format_chat_history()
-                prompt_vars = {
-                        "Context": st.session_state.context,
-                        "ChatHistory": chat_history
-                }
-
-                chat_prompt = pm.get_prompt("chat_prompt", variables=prompt_vars)
-                ai_response = generate_response(chat_prompt, MODEL_CHAT, groq_api_key)
-
-                # Add to chat history
-                st.session_state.chat.append({
-                        "role": "you",
-                        "content": ai_response,
-                })
-
-                # Refresh the page
-                st.rerun()
+    # Chat section
+    chat_fragment(groq_api_key)
 
     # Coach review section
     st.write("**AI Coach Review**")
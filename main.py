@@ -1,16 +1,20 @@
 import os
 import io
-import tempfile
-from typing import Optional
+import threading
+from functools import lru_cache
+from typing import Iterator, Optional
 
-import whisper
-import torchaudio
 from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Streamlit runs each session in its own thread and Whisper models are not
+# safe to use from several threads at once. Loading has its own lock so a
+# first-time load doesn't hold up transcriptions on an already loaded model.
+_WHISPER_LOAD_LOCK = threading.Lock()
+_WHISPER_LOCK = threading.Lock()
+
 
 class MissingAPIKeyError(Exception):
     """Raised when the GROQ API key is missing or invalid."""
@@ -41,6 +45,42 @@ def _validate_api_key(groq_api_key: Optional[str] = None) -> str:
     return groq_api_key
 
 
+@lru_cache(maxsize=None)
+def _load_whisper_model(model_name: str = "base.en"):
+    """
+    Load a Whisper model once per process and reuse it.
+
+    Args:
+        model_name: Name of the Whisper model to load
+
+    Returns:
+        Loaded Whisper model
+    """
+    import whisper
+
+    return whisper.load_model(model_name)
+
+
+@lru_cache(maxsize=8)
+def _get_chat_model(model_name: str, groq_api_key: str):
+    """
+    Initialize a chat model once per model name and API key and reuse it.
+
+    Reusing the model keeps its underlying HTTP client, and therefore its
+    pooled connections, alive between requests.
+
+    Args:
+        model_name: Name of the model to use
+        groq_api_key: Validated API key for Groq
+
+    Returns:
+        Chat model instance
+    """
+    from langchain.chat_models import init_chat_model
+
+    return init_chat_model(model_name, model_provider="groq", api_key=groq_api_key)
+
+
 def transcribe_audio(audio_data: bytes) -> str:
     """
     Transcribe audio data to text.
@@ -51,27 +91,28 @@ def transcribe_audio(audio_data: bytes) -> str:
     Returns:
         Transcribed text or error message
     """
-    temp_audio_path = None
     try:
-        # Create a temporary file to store audio data
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-            temp_audio.write(audio_data)
-            temp_audio_path = temp_audio.name
-
-        # Load Whisper model and transcribe audio
-        model = whisper.load_model("base.en")  # or any other model size
-        result = model.transcribe(temp_audio_path)
+        # Heavy audio dependencies are imported on first use
+        import torchaudio
+        import whisper
+
+        # Decode audio in memory and convert it to 16 kHz mono for Whisper
+        waveform, sample_rate = torchaudio.load(io.BytesIO(audio_data))
+        waveform = waveform.mean(dim=0)
+        if sample_rate != whisper.audio.SAMPLE_RATE:
+            waveform = torchaudio.functional.resample(waveform, sample_rate, whisper.audio.SAMPLE_RATE)
+
+        # Get the cached Whisper model and transcribe audio, one session at a time
+        with _WHISPER_LOAD_LOCK:
+            model = _load_whisper_model("base.en")  # or any other model size
+        with _WHISPER_LOCK:
+            result = model.transcribe(waveform)
 
         return result["text"]
 
     except Exception as e:
         return f"Transcription error: {str(e)}"
 
-    finally:
-        # Ensure a temporary file is deleted even if an error occurs
-        if temp_audio_path and os.path.exists(temp_audio_path):
-            os.unlink(temp_audio_path)
-
 
 def generate_response(prompt: str, model_name: str, groq_api_key: Optional[str] = None) -> str:
     """
@@ -89,11 +130,42 @@ def generate_response(prompt: str, model_name: str, groq_api_key: Optional[str]
         # Validate and get API key
         groq_api_key = _validate_api_key(groq_api_key)
 
-        # Initialize and invoke the model with API key
-        model = init_chat_model(model_name, model_provider="groq", api_key=groq_api_key)
+        # Get the cached model for this API key and invoke it
+        model = _get_chat_model(model_name, groq_api_key)
         response = model.invoke(prompt)
 
         return response.content if response else "No response generated."
 
     except Exception as e:
-        return f"Error generating response: {e!s}"
\ No newline at end of file
+        return f"Error generating response: {e!s}"
+
+
+def stream_response(prompt: str, model_name: str, groq_api_key: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream a response from a prompt using a language model.
+
+    Args:
+        prompt: Input text for the model
+        model_name: Name of the model to use
+        groq_api_key: API key for Groq. If None, uses GROQ_API_KEY from environment.
+
+    Yields:
+        Chunks of the response text as they are generated
+    """
+    try:
+        # Validate and get API key
+        groq_api_key = _validate_api_key(groq_api_key)
+
+        # Get the cached model for this API key and stream the response
+        model = _get_chat_model(model_name, groq_api_key)
+        generated = False
+        for chunk in model.stream(prompt):
+            if chunk.content:
+                generated = True
+                yield chunk.content
+
+        if not generated:
+            yield "No response generated."
+
+    except Exception as e:
+        yield f"Error generating response: {e!s}"
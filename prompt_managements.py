@@ -1,3 +1,5 @@
+import string
+
 RANDOM_CONTEXT = """**Role:** Dynamic English Scenario Generator  
 **Task:** Create **ONE** 60-80 word paragraph for practical English practice in COMMON LIFE SITUATIONS.  
 
@@ -93,6 +95,47 @@ ENGLISH_COACH_PROMPT = """You're an ESL specialist grading adult beginner Englis
 1. Grade: CEFR level (A1/A2/B1) with confidence (0-100%)
 2. Corrections: Only major errors (grammar/vocabulary blocking meaning)
 3. Feedback: 2 strengths, 1 improvement area"""
+_FORMATTER = string.Formatter()
+
+
+def _compile_template(template: str):
+    """
+    Pre-parse a format template into substitution tokens.
+
+    Args:
+        template: String with placeholders (e.g., "Hello, {name}!").
+
+    Returns:
+        List of (literal, field, spec, conversion) tuples from
+        string.Formatter.parse, or None if the template uses syntax the
+        token renderer does not handle (positional fields, nested format
+        specs, malformed braces) and must go through str.format instead.
+    """
+    try:
+        tokens = list(_FORMATTER.parse(template))
+    except ValueError:
+        return None
+    for _, field, spec, _ in tokens:
+        if field is None:
+            continue
+        root = field.split('.', 1)[0].split('[', 1)[0]
+        if not root or root.isdigit() or (spec and '{' in spec):
+            return None
+    return tokens
+
+
+def _render_template(tokens: list, variables: dict) -> str:
+    """Substitute variables into pre-parsed template tokens."""
+    parts = []
+    for literal, field, spec, conversion in tokens:
+        parts.append(literal)
+        if field is not None:
+            value, _ = _FORMATTER.get_field(field, (), variables)
+            value = _FORMATTER.convert_field(value, conversion)
+            parts.append(_FORMATTER.format_field(value, spec))
+    return "".join(parts)
+
+
 class PromptManager:
     def __init__(self):
         self.prompts = {}  # Stores prompt templates and their defaults
@@ -115,7 +158,8 @@ class PromptManager:
             default_vars = {}
         self.prompts[name] = {
                 'template': template,
-                'defaults': default_vars
+                'defaults': default_vars,
+                'tokens': _compile_template(template)
         }
 
     def get_prompt(
@@ -149,8 +193,11 @@ class PromptManager:
 
         # Handle missing variables
         template = prompt_data['template']
+        tokens = prompt_data['tokens']
         try:
-            return template.format(**all_vars)
+            if tokens is None:
+                return template.format(**all_vars)
+            return _render_template(tokens, all_vars)
         except KeyError as e:
             if not strict:
                 return template  # Return unformatted template on failure